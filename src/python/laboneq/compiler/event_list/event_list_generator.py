@@ -237,7 +237,9 @@ class EventListGenerator:
                         "value": value,
                         "section_name": ir.section,
                         "device_id": osc.device,
-                        "signal": osc.signals,
+                        # Frozen, so that it hashes once when tested for
+                        # membership in a set of signal IDs
+                        "signal": frozenset(osc.signals),
                         "oscillator_id": osc.id,
                         "id": start_id,
                         "chain_element_id": start_id,
@@ -315,6 +315,7 @@ def analyze_set_oscillator_times(
         step_frequency = 0
 
     retval = AWGSampledEventSequence()
+    handled = {index for index, _ in set_oscillator_events}
 
     for index, event in set_oscillator_events:
         iteration = event["iteration"]
@@ -343,9 +344,8 @@ def analyze_set_oscillator_times(
 
         retval.add(event_time_in_samples, set_oscillator_event)
 
-    # remove what we handled
-    for i, _ in reversed(set_oscillator_events):
-        events.pop(i)
+    # remove what we handled, in a single pass
+    events[:] = [event for index, event in enumerate(events) if index not in handled]
 
     return retval
 
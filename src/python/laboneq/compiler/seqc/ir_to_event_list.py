@@ -2,10 +2,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from __future__ import annotations
+from collections import defaultdict
+import functools
 import itertools
 import math
 from typing import Iterator, TYPE_CHECKING
 
+import numpy as np
+
 from laboneq.compiler.common.compiler_settings import CompilerSettings, TINYSAMPLE
 from laboneq.compiler.common.device_type import DeviceType
 from laboneq.compiler.common import awg_info
@@ -17,26 +21,92 @@ from laboneq.compiler.common.pulse_parameters import encode_pulse_parameters
 from laboneq.compiler.common.play_wave_type import PlayWaveType
 
 if TYPE_CHECKING:
+    from laboneq.data.compilation_job import DeviceInfoType
     from laboneq.compiler.seqc.passes.oscillator_parameters import OscillatorParameters
 
 
-def _apply_frequencies(event_list: EventList, osc_times: OscillatorParameters):
-    """Apply software oscillator frequencies to the event list in-place."""
-    # TODO: Remove once path to pulse generation from IR is ok.
-    events = [
-        e
-        for e in event_list
-        if e["event_type"] in [EventType.PLAY_START, EventType.ACQUIRE_START]
-    ]
-    for event in events:
-        if event["signal"] not in osc_times.freq_keys():
-            continue
-        event["oscillator_frequency"] = osc_times.freq_at(
-            event["signal"], event["time"]
+_TWO_PI = 2.0 * math.pi
+
+_OSC_EVENT_PRIORITY = {
+    EventType.PLAY_START: 0,
+    EventType.ACQUIRE_START: 0,
+    EventType.DELAY_START: 0,
+    EventType.RESET_SW_OSCILLATOR_PHASE: -15,
+}
+_OSC_EVENT_TYPES = frozenset(_OSC_EVENT_PRIORITY)
+_FREQUENCY_EVENT_TYPES = frozenset({EventType.PLAY_START, EventType.ACQUIRE_START})
+# The priorities above are packed into the low byte of an int64 sort key
+_PRIORITY_BITS = 8
+_PRIORITY_OFFSET = 1 << (_PRIORITY_BITS - 1)
+_MAX_PACKED_TIME = 1 << (63 - _PRIORITY_BITS)
+
+
+def _apply_frequencies(
+    events: EventList, times: np.ndarray, osc_params: OscillatorParameters
+):
+    """Apply software oscillator frequencies to the play and acquire events in-place.
+
+    `times` holds the event times in units of tiny samples, the frequencies are
+    looked up in one batch per signal.
+    """
+    freq_keys = osc_params.freq_keys()
+    positions_by_signal = defaultdict(list)
+    for position, event in enumerate(events):
+        if (
+            event["event_type"] in _FREQUENCY_EVENT_TYPES
+            and event["signal"] in freq_keys
+        ):
+            positions_by_signal[event["signal"]].append(position)
+    for signal_id, positions in positions_by_signal.items():
+        frequencies = osc_params.freq_at_many(signal_id, times[positions])
+        for position, frequency in zip(positions, frequencies.tolist()):
+            events[position]["oscillator_frequency"] = (
+                None if math.isnan(frequency) else frequency
+            )
+
+
+@functools.cache
+def _device_type(device_info_type: DeviceInfoType | None) -> DeviceType | None:
+    """The `DeviceType` of a device, `None` if there is none (e.g. PQSC)."""
+    if device_info_type is None:
+        return None
+    try:
+        return DeviceType.from_device_info_type(device_info_type)  # @IgnoreException
+    except ValueError:
+        return None
+
+
+_SignalTables = tuple[dict[str, int], list[bool], list[bool]]
+
+
+def _signal_tables(signals: list[ir_def.SignalIR]) -> _SignalTables:
+    """Intern the signal UIDs and tabulate their oscillator properties.
+
+    Returns the signal index by UID, and per signal index whether the signal has a
+    hardware oscillator, and whether it is on a QA device.
+    """
+    signal_index = {}
+    is_hw_osc = []
+    is_qa_device = []
+    for signal in signals:
+        signal_index[signal.uid] = len(is_hw_osc)
+        is_hw_osc.append(
+            signal.oscillator.is_hardware if signal.oscillator is not None else False
+        )
+        device_type = (
+            _device_type(signal.device.device_type)
+            if signal.device is not None
+            else None
         )
+        is_qa_device.append(device_type is not None and device_type.is_qa_device)
+    return signal_index, is_hw_osc, is_qa_device
 
 
-def _calculate_osc_phase(event_list: EventList, ir: ir_def.IRTree):
+def _calculate_osc_phase(
+    event_list: EventList,
+    signal_tables: _SignalTables,
+    osc_params: OscillatorParameters | None = None,
+):
     """Traverse the event list, and elaborate the phase of each played pulse.
 
     For SW oscillators, calculate the time since the last set/reset of that oscillator,
@@ -48,6 +118,12 @@ def _calculate_osc_phase(event_list: EventList, ir: ir_def.IRTree):
     For HW oscillators, do nothing. Absolute phase sets are illegal (and were caught in
     the scheduler), and phase increments will be handled in the code generator.
 
+    If `osc_params` is given, the software oscillator frequency of play and acquire
+    events is looked up first and stored as `oscillator_frequency`.
+
+    The event times are expected in units of tiny samples. `signal_tables` are the
+    per-signal oscillator properties as created by `_signal_tables()`.
+
     After this function returns, all play events will contain the following phase-related
     fields:
      - "phase": the baseband phase of the pulse
@@ -58,63 +134,80 @@ def _calculate_osc_phase(event_list: EventList, ir: ir_def.IRTree):
     oscillator_phase_cumulative = {}
     oscillator_phase_sets = {}
     phase_reset_time = 0.0
-    priority_map = {
-        EventType.PLAY_START: 0,
-        EventType.DELAY_START: 0,
-        EventType.RESET_SW_OSCILLATOR_PHASE: -15,
-    }
-    sorted_events = sorted(
-        (e for e in event_list if e["event_type"] in priority_map),
-        key=lambda e: (e["time"], priority_map[e["event_type"]]),
+    # Filter once, both the frequency lookup and the phase traversal use this view.
+    # Sort on columns rather than on per-event key tuples. The time and priority
+    # are packed into a single key, unless the time could overflow it.
+    osc_events = [e for e in event_list if e["event_type"] in _OSC_EVENT_TYPES]
+    count = len(osc_events)
+    times = np.fromiter((e["time"] for e in osc_events), dtype=np.int64, count=count)
+    priorities = np.fromiter(
+        (_OSC_EVENT_PRIORITY[e["event_type"]] for e in osc_events),
+        dtype=np.int64,
+        count=count,
     )
-
-    oscillator_map = {signal.uid: signal.oscillator for signal in ir.signals}
-    device_map = {signal.uid: signal.device for signal in ir.signals}
+    if count == 0 or times.max() < _MAX_PACKED_TIME:
+        keys = (times << _PRIORITY_BITS) | (priorities + _PRIORITY_OFFSET)
+        order = np.argsort(keys, kind="stable")
+    else:
+        order = np.lexsort((priorities, times))
+    sorted_events = [osc_events[i] for i in order.tolist()]
+    if osc_params is not None:
+        _apply_frequencies(sorted_events, times[order], osc_params)
+
+    signal_index, is_hw_osc_table, is_qa_device_table = signal_tables
+
+    # Bind the loop invariants to locals, the loop runs once per pulse.
+    reset_sw_osc_phase = EventType.RESET_SW_OSCILLATOR_PHASE
+    acquire_start = EventType.ACQUIRE_START
+    tinysample = TINYSAMPLE
 
     for event in sorted_events:
-        if event["event_type"] == EventType.RESET_SW_OSCILLATOR_PHASE:
-            phase_reset_time = event["time"]
-            for signal_id in oscillator_phase_cumulative.keys():
-                oscillator_phase_cumulative[signal_id] = 0.0
+        event_type = event["event_type"]
+        if event_type == reset_sw_osc_phase:
+            phase_reset_time = event["time"] * tinysample
+            # All reads default to 0.0, so dropping the entries resets them
+            oscillator_phase_cumulative.clear()
+            continue
 
-        else:
-            signal_id = event["signal"]
-            oscillator_info = oscillator_map[signal_id]
-            is_hw_osc = oscillator_info.is_hardware if oscillator_info else False
-            if (phase_incr := event.get("increment_oscillator_phase")) is not None:
-                if not is_hw_osc:
-                    if signal_id not in oscillator_phase_cumulative:
-                        oscillator_phase_cumulative[signal_id] = 0.0
-                    oscillator_phase_cumulative[signal_id] += phase_incr
-                    del event["increment_oscillator_phase"]
-
-            # if both "increment_oscillator_phase" and "set_oscillator_phase" are specified,
-            # the absolute phase overwrites the increment.
-            if (osc_phase := event.get("set_oscillator_phase")) is not None:
-                assert not oscillator_info.is_hardware, (
-                    "cannot set phase of HW oscillators (should have been caught earlier)"
+        if event_type == acquire_start:
+            continue
+
+        signal_id = event["signal"]
+
+        signal_idx = signal_index[signal_id]
+        is_hw_osc = is_hw_osc_table[signal_idx]
+        if (phase_incr := event.get("increment_oscillator_phase")) is not None:
+            if not is_hw_osc:
+                oscillator_phase_cumulative[signal_id] = (
+                    oscillator_phase_cumulative.get(signal_id, 0.0) + phase_incr
+                )
+                del event["increment_oscillator_phase"]
+
+        # if both "increment_oscillator_phase" and "set_oscillator_phase" are specified,
+        # the absolute phase overwrites the increment.
+        if (osc_phase := event.get("set_oscillator_phase")) is not None:
+            assert not is_hw_osc, (
+                "cannot set phase of HW oscillators (should have been caught earlier)"
+            )
+            oscillator_phase_cumulative[signal_id] = osc_phase
+            oscillator_phase_sets[signal_id] = event["time"] * tinysample
+            del event["set_oscillator_phase"]
+
+        if is_hw_osc:
+            event["oscillator_phase"] = None
+        else:  # SW oscillator
+            if not is_qa_device_table[signal_idx]:
+                incremented_phase = oscillator_phase_cumulative.get(signal_id, 0.0)
+                phase_reference_time = max(
+                    phase_reset_time, oscillator_phase_sets.get(signal_id, 0.0)
                 )
-                oscillator_phase_cumulative[signal_id] = osc_phase
-                oscillator_phase_sets[signal_id] = event["time"]
-                del event["set_oscillator_phase"]
-
-            if is_hw_osc:
-                event["oscillator_phase"] = None
-            else:  # SW oscillator
-                device = device_map[signal_id]
-                device_type = DeviceType.from_device_info_type(device.device_type)
-                if not device_type.is_qa_device:
-                    incremented_phase = oscillator_phase_cumulative.get(signal_id, 0.0)
-                    phase_reference_time = max(
-                        phase_reset_time, oscillator_phase_sets.get(signal_id, 0.0)
-                    )
-                    oscillator_frequency = event.get("oscillator_frequency", 0.0)
-                    t = event["time"] - phase_reference_time
-                    event["oscillator_phase"] = (
-                        t * 2.0 * math.pi * oscillator_frequency + incremented_phase
-                    )
-                else:
-                    event["oscillator_phase"] = 0.0
+                oscillator_frequency = event.get("oscillator_frequency", 0.0)
+                t = event["time"] * tinysample - phase_reference_time
+                event["oscillator_phase"] = (
+                    t * _TWO_PI * oscillator_frequency + incremented_phase
+                )
+            else:
+                event["oscillator_phase"] = 0.0
 
 
 def _create_start_events(devices: list[ir_def.DeviceIR]) -> EventList:
@@ -123,14 +216,8 @@ def _create_start_events(devices: list[ir_def.DeviceIR]) -> EventList:
     # Add initial events to reset the NCOs.
     # Todo (PW): Drop once system tests have been migrated from legacy behaviour.
     for device_info in devices:
-        try:
-            device_type = DeviceType.from_device_info_type(  # @IgnoreException
-                device_info.device_type
-            )
-        except ValueError:
-            # Not every device has a corresponding DeviceType (e.g. PQSC)
-            continue
-        if not device_type.supports_reset_osc_phase:
+        device_type = _device_type(device_info.device_type)
+        if device_type is None or not device_type.supports_reset_osc_phase:
             continue
         retval.append(
             {
@@ -150,8 +237,10 @@ def generate_event_list_from_ir(
     max_events: int,
 ) -> EventList:
     event_list = _create_start_events(ir.devices)
+    next_id = None
     if ir.root is not None:
         id_tracker = itertools.count()
+        next_id = id_tracker.__next__
         event_list.extend(
             event_gen.EventListGenerator().run(
                 ir.root,
@@ -162,15 +251,14 @@ def generate_event_list_from_ir(
                 settings=settings,
             )
         )
-        # assign every event an id
-        for event in event_list:
-            if "id" not in event:
-                event["id"] = next(id_tracker)
-    # convert time from units of tiny samples to seconds
+    # TODO: Move to oscillator params pass
+    _calculate_osc_phase(event_list, _signal_tables(ir.signals))
     for event in event_list:
+        if next_id is not None and "id" not in event:
+            # assign every event an id
+            event["id"] = next_id()
+        # convert time from units of tiny samples to seconds
         event["time"] = event["time"] * TINYSAMPLE
-    # TODO: Move to oscillator params pass
-    _calculate_osc_phase(event_list, ir)
     return event_list
 
 
@@ -392,11 +480,13 @@ def event_list_per_awg(
     """Generate event list per AWG in the tree root."""
     event_lists_by_awg = {}
     id_tracker = itertools.count()
+    next_id = id_tracker.__next__
+    devices = {dev.uid: dev for dev in tree.devices}
+    signal_tables = _signal_tables(tree.signals)
     for awg_ir in tree.root.children:
         assert isinstance(awg_ir, ir_seqc.SingleAwgIR)
-        event_list = _create_start_events(
-            [dev for dev in tree.devices if dev.uid == awg_ir.awg.device_id]
-        )
+        device = devices.get(awg_ir.awg.device_id)
+        event_list = _create_start_events([device] if device is not None else [])
         event_list.extend(
             EventListGeneratorCodeGenerator().run(
                 awg_ir,
@@ -407,13 +497,12 @@ def event_list_per_awg(
                 id_tracker=id_tracker,
             )
         )
-        _apply_frequencies(event_list, osc_params)
+        _calculate_osc_phase(event_list, signal_tables, osc_params)
         for event in event_list:
             if "id" not in event:
                 # assign every event an id
-                event["id"] = next(id_tracker)
+                event["id"] = next_id()
             # convert time from units of tiny samples to seconds
             event["time"] = event["time"] * TINYSAMPLE
-        _calculate_osc_phase(event_list, tree)
         event_lists_by_awg[awg_ir.awg.key] = event_list
     return event_lists_by_awg
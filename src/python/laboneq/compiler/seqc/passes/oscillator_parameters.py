@@ -2,8 +2,11 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from __future__ import annotations
-from collections import defaultdict
-import sortedcollections
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+
 from laboneq.compiler import ir as ir_mod
 
 
@@ -11,65 +14,102 @@ from typing import KeysView
 
 
 class OscillatorParameters:
-    def __init__(self, values: dict[str, tuple[int, float]]):
-        self._freq_by_signal: dict[str, sortedcollections.NearestDict] = {}
+    def __init__(self, values: dict[str, list[tuple[int, float]]]):
+        self._times_by_signal: dict[str, np.ndarray] = {}
+        self._freqs_by_signal: dict[str, np.ndarray] = {}
         for k, v in values.items():
-            self._freq_by_signal[k] = sortedcollections.NearestDict(
-                {time: freq for time, freq in sorted(v, key=lambda x: x[0])},
-                rounding=sortedcollections.NearestDict.NEAREST_PREV,
-            )
-        # Precompute minimum, as otherwise non-existed (too early) timestamp would raise an KeyError
-        self._mins = {sig: vals.keys()[0] for sig, vals in self._freq_by_signal.items()}
+            # Stable sort, so the last of several frequencies set at once wins
+            v = sorted(v, key=itemgetter(0))
+            self._times_by_signal[k] = np.array([t for t, _ in v], dtype=np.int64)
+            self._freqs_by_signal[k] = np.array([f for _, f in v], dtype=np.float64)
 
     def freq_keys(self) -> KeysView:
-        return self._freq_by_signal.keys()
+        return self._freqs_by_signal.keys()
 
     def freq_at(self, identifier: str, time: float) -> float | None:
         """Oscillator frequency at given timestamp for given identifier."""
-        if time < self._mins[identifier]:
+        idx = int(
+            np.searchsorted(self._times_by_signal[identifier], time, side="right")
+        )
+        if idx == 0:
+            # Too early, the frequency is not set yet
             return None
-        return self._freq_by_signal[identifier][time]
+        return float(self._freqs_by_signal[identifier][idx - 1])
+
+    def freq_at_many(self, identifier: str, times: np.ndarray) -> np.ndarray:
+        """Oscillator frequencies at given timestamps for given identifier.
+
+        Timestamps before the first frequency is set yield NaN.
+        """
+        idx = np.searchsorted(self._times_by_signal[identifier], times, side="right")
+        return np.where(
+            idx > 0,
+            self._freqs_by_signal[identifier][np.maximum(idx - 1, 0)],
+            np.nan,
+        )
 
 
 class _PickOscillatorParameters:
     """Traverse the `IRTree` and find oscillator parameters."""
 
     def __init__(self):
-        self._sw_osc_times = defaultdict(list)
+        self._sw_osc_times: list[tuple[str, int, float]] = []
+        self._visitors = {
+            ir_mod.SetOscillatorFrequencyIR: self.visit_SetOscillatorFrequencyIR,
+            ir_mod.InitialOscillatorFrequencyIR: self.visit_InitialOscillatorFrequencyIR,
+        }
 
-    def run(self, node: ir_mod.RootScheduleIR) -> dict:
+    def run(self, node: ir_mod.RootScheduleIR) -> dict[str, list[tuple[int, float]]]:
         self.visit(node, 0)
-        result = self._sw_osc_times
-        self._sw_osc_times = defaultdict(list)
-        return result
-
-    def visit(self, node: ir_mod.IntervalIR, start: int):
-        visitor = getattr(self, f"visit_{node.__class__.__name__}", self.generic_visit)
-        return visitor(node, start)
-
-    def generic_visit(self, node: ir_mod.IntervalIR, start: int) -> None:
-        for start_ch, child in node.iter_children():
-            # Absolute times
-            self.visit(child, start + start_ch)
+        sw_osc_times = self._sw_osc_times
+        self._sw_osc_times = []
+        # Stable sort, frequencies set at the same time keep their visiting order
+        sw_osc_times.sort(key=itemgetter(0, 1))
+        return {
+            sig: [(time, value) for _, time, value in group]
+            for sig, group in groupby(sw_osc_times, key=itemgetter(0))
+        }
+
+    def visit(self, node: ir_mod.IntervalIR, start: int) -> None:
+        # Walk the tree with an explicit stack instead of recursion
+        visitors = self._visitors
+        stack = [(node, start)]
+        while stack:
+            node, start = stack.pop()
+            visitor = visitors.get(type(node))
+            if visitor is not None:
+                visitor(node, start)
+                continue
+            # Absolute times, pushed in reverse to visit the children in order
+            stack.extend(
+                reversed(
+                    [
+                        (child, start + start_ch)
+                        for start_ch, child in node.iter_children()
+                    ]
+                )
+            )
 
     def visit_SetOscillatorFrequencyIR(
         self, node: ir_mod.SetOscillatorFrequencyIR, start: int
     ) -> None:
-        for osc, value in zip(node.oscillators, node.values):
-            if osc.is_hardware:
-                continue
-            for sig in osc.signals:
-                self._sw_osc_times[sig].append((start, value))
+        self._sw_osc_times.extend(
+            (sig, start, value)
+            for osc, value in zip(node.oscillators, node.values)
+            if not osc.is_hardware
+            for sig in osc.signals
+        )
 
     def visit_InitialOscillatorFrequencyIR(
         self, node: ir_mod.InitialOscillatorFrequencyIR, start: int
     ) -> None:
         # Initial frequency is only in the Rootschedule.
-        for osc, value in zip(node.oscillators, node.values):
-            if osc.is_hardware:
-                continue
-            for sig in osc.signals:
-                self._sw_osc_times[sig].append((start, value))
+        self._sw_osc_times.extend(
+            (sig, start, value)
+            for osc, value in zip(node.oscillators, node.values)
+            if not osc.is_hardware
+            for sig in osc.signals
+        )
 
 
 def calculate_oscillator_parameters(tree: ir_mod.IRTree) -> OscillatorParameters:
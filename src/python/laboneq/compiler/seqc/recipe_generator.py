@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import copy
 import dataclasses
 import logging
 import math
@@ -37,6 +38,7 @@ from laboneq.core.types.enums import AcquisitionType
 from laboneq.core.types.enums.acquisition_type import is_spectroscopy
 from laboneq.data.calibration import PortMode, CancellationSource
 from laboneq.data.compilation_job import (
+    AmplifierPumpInfo,
     DeviceInfo,
     DeviceInfoType,
     ParameterInfo,
@@ -70,17 +72,56 @@ if TYPE_CHECKING:
 
 _logger = logging.getLogger(__name__)
 
+# PrecompensationInfo members passed on to the recipe
+_PRECOMPENSATION_FIELDS = ("exponential", "high_pass", "bounce", "FIR")
+
+_SIGNAL_TYPE_BY_VALUE = {signal_type.value: signal_type for signal_type in SignalType}
+
+# Amplifier pump settings that are omitted when unset, and may be swept
+_AMPLIFIER_PUMP_SWEEPABLE_FIELDS = (
+    "pump_frequency",
+    "pump_power",
+    "probe_frequency",
+    "probe_power",
+    "cancellation_phase",
+    "cancellation_attenuation",
+)
+
+
+def _uid_if_parameter(value):
+    """The UID of a swept parameter, otherwise the value itself."""
+    return value.uid if isinstance(value, ParameterInfo) else value
+
+
+def _precompensation_to_dict(precompensation: PrecompensationInfo) -> dict[str, Any]:
+    precomp_dict: dict[str, Any] = {}
+    for field in _PRECOMPENSATION_FIELDS:
+        value = getattr(precompensation, field)
+        if isinstance(value, list):
+            value = [dataclasses.asdict(v) for v in value]
+        elif value is not None:
+            value = dataclasses.asdict(value)
+        precomp_dict[field] = value
+    if precomp_dict["high_pass"] is not None:
+        precomp_dict["high_pass"].pop("clearing", None)
+    return precomp_dict
+
 
 class RecipeGenerator:
     def __init__(self):
         self._recipe = Recipe()
         self._recipe.versions.target_labone = zhinst_version
         self._recipe.versions.laboneq = get_version()
-
-    def add_oscillator_params(self, experiment_dao: ExperimentDAO):
-        for signal_id in experiment_dao.signals():
-            signal_info = experiment_dao.signal_info(signal_id)
-            oscillator_info = experiment_dao.signal_oscillator(signal_id)
+        self._initializations_by_uid: dict[str, Initialization] = {}
+        # PrecompensationInfo is unhashable, so this is keyed by id(); the info
+        # object is kept alongside so the id stays valid.
+        self._precomp_cache: dict[int, tuple[PrecompensationInfo, dict]] = {}
+        # PPC device uid -> ppc channel idx -> the ppchannel dict in the recipe
+        self._ppchannels_by_device: dict[str, dict[int, dict[str, Any]]] = {}
+
+    def add_oscillator_params(self, signal_infos: dict[str, SignalInfo]):
+        for signal_id, signal_info in signal_infos.items():
+            oscillator_info = signal_info.oscillator
             if oscillator_info is None:
                 continue
             if oscillator_info.is_hardware:
@@ -89,38 +130,46 @@ class RecipeGenerator:
                 else:
                     frequency, param = oscillator_info.frequency, None
 
-                for ch in signal_info.channels:
-                    self._recipe.oscillator_params.append(
+                oscillator_uid = oscillator_info.uid
+                device_uid = signal_info.device.uid
+                self._recipe.oscillator_params.extend(
+                    [
                         OscillatorParam(
-                            id=oscillator_info.uid,
-                            device_id=signal_info.device.uid,
+                            id=oscillator_uid,
+                            device_id=device_uid,
                             channel=ch,
                             signal_id=signal_id,
                             frequency=frequency,
                             param=param,
                         )
-                    )
+                        for ch in signal_info.channels
+                    ]
+                )
 
     def add_integrator_allocations(
         self,
         integration_unit_allocation: dict[str, IntegrationUnitAllocation],
         experiment_dao: ExperimentDAO,
     ):
+        integrator_allocations = self._recipe.integrator_allocations
         for signal_id, integrator in integration_unit_allocation.items():
             thresholds = experiment_dao.threshold(signal_id)
             n = max(1, integrator.kernel_count or 0)
             if not thresholds or thresholds == [None]:
                 thresholds = [0.0] * (n * (n + 1) // 2)
+            else:
+                thresholds = ensure_list(thresholds)
 
-            integrator_allocation = IntegratorAllocation(
-                signal_id=signal_id,
-                device_id=integrator.device_id,
-                awg=integrator.awg_nr,
-                channels=integrator.channels,
-                thresholds=ensure_list(thresholds),
-                kernel_count=n,
+            integrator_allocations.append(
+                IntegratorAllocation(
+                    signal_id=signal_id,
+                    device_id=integrator.device_id,
+                    awg=integrator.awg_nr,
+                    channels=integrator.channels,
+                    thresholds=thresholds,
+                    kernel_count=n,
+                )
             )
-            self._recipe.integrator_allocations.append(integrator_allocation)
 
     def add_acquire_lengths(self, integration_times: IntegrationTimes):
         self._recipe.acquire_lengths.extend(
@@ -134,27 +183,29 @@ class RecipeGenerator:
             ]
         )
 
-    def add_devices_from_experiment(self, experiment_dao: ExperimentDAO):
-        for device in experiment_dao.device_infos():
-            self._recipe.initializations.append(
-                Initialization(
-                    device_uid=device.uid, device_type=device.device_type.name
-                )
+    def add_devices_from_experiment(self, device_infos: list[DeviceInfo]):
+        for device in device_infos:
+            initialization = Initialization(
+                device_uid=device.uid, device_type=device.device_type.name
             )
+            self._recipe.initializations.append(initialization)
+            self._initializations_by_uid.setdefault(device.uid, initialization)
 
     def _find_initialization(self, device_uid) -> Initialization:
-        for initialization in self._recipe.initializations:
-            if initialization.device_uid == device_uid:
-                return initialization
-        raise LabOneQException(
-            f"Internal error: missing initialization for device {device_uid}"
-        )
+        try:
+            return self._initializations_by_uid[device_uid]
+        except KeyError:
+            raise LabOneQException(
+                f"Internal error: missing initialization for device {device_uid}"
+            ) from None
 
     def add_connectivity_from_experiment(
         self,
         experiment_dao: ExperimentDAO,
         leader_properties: LeaderProperties,
         clock_settings: Dict[str, Any],
+        signal_infos: dict[str, SignalInfo],
+        device_infos: list[DeviceInfo],
     ):
         if leader_properties.global_leader is not None:
             initialization = self._find_initialization(leader_properties.global_leader)
@@ -171,40 +222,41 @@ class RecipeGenerator:
 
         # ppc device uid -> acquire signal ids
         ppc_signals: dict[str, list[str]] = {}
-        for signal_id in experiment_dao.signals():
-            amplifier_pump = experiment_dao.signal_info(signal_id).amplifier_pump
+        amplifier_pumps: dict[str, AmplifierPumpInfo] = {}
+        for signal_id, signal_info in signal_infos.items():
+            amplifier_pump = signal_info.amplifier_pump
             if amplifier_pump is None:
                 continue
+            amplifier_pumps[signal_id] = amplifier_pump
             device_id = amplifier_pump.ppc_device.uid
+            device_ppc_signals = ppc_signals.get(device_id)
+            if device_ppc_signals is None:
+                device_ppc_signals = ppc_signals[device_id] = []
 
-            for other_signal in ppc_signals.get(device_id, []):
-                other_amplifier_pump = experiment_dao.amplifier_pump(other_signal)
+            for other_signal in device_ppc_signals:
+                other_amplifier_pump = amplifier_pumps[other_signal]
                 if amplifier_pump.channel == other_amplifier_pump.channel:
                     assert other_amplifier_pump == amplifier_pump, (
                         f"Mismatched amplifier_pump configuration between signals"
                         f" {other_signal} and {signal_id}, which are connected to the same"
                         f" PPC channel"
                     )
-            ppc_signals.setdefault(device_id, []).append(signal_id)
+            device_ppc_signals.append(signal_id)
 
-        for device in experiment_dao.device_infos():
+        use_2GHz_for_HDAWG = clock_settings["use_2GHz_for_HDAWG"]
+        for device in device_infos:
             device_uid = device.uid
             initialization = self._find_initialization(device_uid)
 
-            if (
-                device.device_type.value == "hdawg"
-                and clock_settings["use_2GHz_for_HDAWG"]
-            ):
+            if device.device_type.value == "hdawg" and use_2GHz_for_HDAWG:
                 initialization.config.sampling_rate = (
                     DeviceType.HDAWG.sampling_rate_2GHz
                 )
 
             if device.device_type.value == "shfppc":
                 ppchannels: dict[int, dict[str, Any]] = {}  # keyed by ppc channel idx
-                for signal in ppc_signals.get(device_uid, []):
-                    amplifier_pump = experiment_dao.amplifier_pump(signal)
-                    if amplifier_pump is None:
-                        continue
+                for signal in ppc_signals.get(device_uid, ()):
+                    amplifier_pump = amplifier_pumps[signal]
                     amplifier_pump_dict: dict[
                         str, str | float | bool | int | CancellationSource | None
                     ] = {
@@ -217,35 +269,27 @@ class RecipeGenerator:
                         "probe_on": amplifier_pump.probe_on,
                         "channel": amplifier_pump.channel,
                     }
-                    for field in [
-                        "pump_frequency",
-                        "pump_power",
-                        "probe_frequency",
-                        "probe_power",
-                        "cancellation_phase",
-                        "cancellation_attenuation",
-                    ]:
+                    for field in _AMPLIFIER_PUMP_SWEEPABLE_FIELDS:
                         val = getattr(amplifier_pump, field)
-                        if val is None:
-                            continue
-                        if isinstance(val, ParameterInfo):
-                            amplifier_pump_dict[field] = val.uid
-                        else:
-                            amplifier_pump_dict[field] = val
-
-                    ppchannels.setdefault(amplifier_pump.channel, {}).update(
-                        amplifier_pump_dict
-                    )
+                        if val is not None:
+                            amplifier_pump_dict[field] = _uid_if_parameter(val)
+
+                    ppchannel = ppchannels.get(amplifier_pump.channel)
+                    if ppchannel is None:
+                        ppchannels[amplifier_pump.channel] = amplifier_pump_dict
+                    else:
+                        ppchannel.update(amplifier_pump_dict)
                 initialization.ppchannels = list(ppchannels.values())
+                self._ppchannels_by_device[device_uid] = ppchannels
 
+        dio_follower_mode = (
+            TriggeringMode.DESKTOP_DIO_FOLLOWER
+            if leader_properties.is_desktop_setup
+            else TriggeringMode.DIO_FOLLOWER
+        )
         for follower in experiment_dao.dio_followers():
             initialization = self._find_initialization(follower)
-            if leader_properties.is_desktop_setup:
-                initialization.config.triggering_mode = (
-                    TriggeringMode.DESKTOP_DIO_FOLLOWER
-                )
-            else:
-                initialization.config.triggering_mode = TriggeringMode.DIO_FOLLOWER
+            initialization.config.triggering_mode = dio_follower_mode
 
         for pqsc_device_id in experiment_dao.pqscs():
             for port in experiment_dao.pqsc_ports(pqsc_device_id):
@@ -280,43 +324,28 @@ class RecipeGenerator:
             output_routers = [
                 RoutedOutput(
                     from_channel=route.from_channel,
-                    amplitude=(
-                        route.amplitude
-                        if not isinstance(route.amplitude, ParameterInfo)
-                        else route.amplitude.uid
-                    ),
-                    phase=(
-                        route.phase
-                        if not isinstance(route.phase, ParameterInfo)
-                        else route.phase.uid
-                    ),
+                    amplitude=_uid_if_parameter(route.amplitude),
+                    phase=_uid_if_parameter(route.phase),
                 )
                 for route in output_routers
             ]
 
         if precompensation is not None:
-            precomp_dict = {
-                k: v
-                for k, v in dataclasses.asdict(precompensation).items()
-                if k in ("exponential", "high_pass", "bounce", "FIR")
-            }
-            if "clearing" in (precomp_dict["high_pass"] or {}):
-                del precomp_dict["high_pass"]["clearing"]
+            cached = self._precomp_cache.get(id(precompensation))
+            if cached is None:
+                cached = (precompensation, _precompensation_to_dict(precompensation))
+                self._precomp_cache[id(precompensation)] = cached
+            # Each output gets its own copy, so edits to one cannot leak
+            precomp_dict = copy.deepcopy(cached[1])
         else:
             precomp_dict = None
 
-        if isinstance(lo_frequency, ParameterInfo):
-            lo_frequency = lo_frequency.uid
-        if isinstance(port_delay, ParameterInfo):
-            port_delay = port_delay.uid
-        if isinstance(amplitude, ParameterInfo):
-            amplitude = amplitude.uid
-        if isinstance(offset, ParameterInfo):
-            offset = offset.uid
-        if isinstance(diagonal, ParameterInfo):
-            diagonal = diagonal.uid
-        if isinstance(off_diagonal, ParameterInfo):
-            off_diagonal = off_diagonal.uid
+        lo_frequency = _uid_if_parameter(lo_frequency)
+        port_delay = _uid_if_parameter(port_delay)
+        amplitude = _uid_if_parameter(amplitude)
+        offset = _uid_if_parameter(offset)
+        diagonal = _uid_if_parameter(diagonal)
+        off_diagonal = _uid_if_parameter(off_diagonal)
         output = IO(
             channel=channel,
             enable=True,
@@ -351,10 +380,8 @@ class RecipeGenerator:
         scheduler_port_delay=0.0,
         port_mode=None,
     ):
-        if isinstance(lo_frequency, ParameterInfo):
-            lo_frequency = lo_frequency.uid
-        if isinstance(port_delay, ParameterInfo):
-            port_delay = port_delay.uid
+        lo_frequency = _uid_if_parameter(lo_frequency)
+        port_delay = _uid_if_parameter(port_delay)
         input = IO(
             channel=channel,
             enable=True,
@@ -372,15 +399,11 @@ class RecipeGenerator:
     def validate_and_postprocess_ios(self, device: DeviceInfo):
         init = self._find_initialization(device.uid)
         if device.device_type == DeviceInfoType.SHFQA:
+            outputs_by_channel: dict[int, IO] = {}
+            for output in init.outputs or []:
+                outputs_by_channel.setdefault(output.channel, output)
             for input in init.inputs or []:
-                output = next(
-                    (
-                        output
-                        for output in init.outputs or []
-                        if output.channel == input.channel
-                    ),
-                    None,
-                )
+                output = outputs_by_channel.get(input.channel)
                 if output is None:
                     continue
                 if input.port_mode is None and output.port_mode is not None:
@@ -407,7 +430,7 @@ class RecipeGenerator:
     ):
         awg = AWG(
             awg=awg_number,
-            signal_type=SignalType(signal_type),
+            signal_type=_SIGNAL_TYPE_BY_VALUE[signal_type],
             signals=signals,
         )
         if feedback_register_config is not None:
@@ -432,11 +455,10 @@ class RecipeGenerator:
         if shfppc_sweep_configuration is not None:
             ppc_device = shfppc_sweep_configuration.ppc_device
             ppc_channel_idx = shfppc_sweep_configuration.ppc_channel
-            ppc_initialization = self._find_initialization(ppc_device)
-            for ppchannel in ppc_initialization.ppchannels:
-                if ppchannel["channel"] == ppc_channel_idx:
-                    break
-            else:
+            ppchannel = self._ppchannels_by_device.get(ppc_device, {}).get(
+                ppc_channel_idx
+            )
+            if ppchannel is None:
                 raise AssertionError("channel not found")
 
             # remove the swept fields from the initialization; no need to set it in NT
@@ -462,10 +484,16 @@ class RecipeGenerator:
         experiment_dao: ExperimentDAO,
         leader_properties: LeaderProperties,
         clock_settings: Dict[str, Any],
+        signal_infos: dict[str, SignalInfo],
+        device_infos: list[DeviceInfo],
     ):
-        self.add_devices_from_experiment(experiment_dao)
+        self.add_devices_from_experiment(device_infos)
         self.add_connectivity_from_experiment(
-            experiment_dao, leader_properties, clock_settings
+            experiment_dao,
+            leader_properties,
+            clock_settings,
+            signal_infos,
+            device_infos,
         )
         self._recipe.is_spectroscopy = is_spectroscopy(experiment_dao.acquisition_type)
 
@@ -479,16 +507,17 @@ class RecipeGenerator:
         self._recipe.max_step_execution_time = max_step_execution_time
 
     def add_measurements(self, measurement_map: dict[str, list[dict]]):
-        for initialization in self._recipe.initializations:
-            device_uid = initialization.device_uid
-            if device_uid in measurement_map:
-                initialization.measurements = [
-                    Measurement(
-                        length=m.get("length"),
-                        channel=m.get("channel"),
-                    )
-                    for m in measurement_map[device_uid]
-                ]
+        for device_uid, measurements in measurement_map.items():
+            initialization = self._initializations_by_uid.get(device_uid)
+            if initialization is None:
+                continue
+            initialization.measurements = [
+                Measurement(
+                    length=m.get("length"),
+                    channel=m.get("channel"),
+                )
+                for m in measurements
+            ]
 
     def recipe(self) -> Recipe:
         return self._recipe
@@ -801,11 +830,7 @@ def calc_inputs(experiment_dao: ExperimentDAO, signal_delays: SignalDelays):
                 signal_info.device.device_type
             )
             if device_type == device_type.SHFQA:
-                ports_delays_raw_shfqa.add(
-                    port_delay.uid
-                    if isinstance(port_delay, ParameterInfo)
-                    else port_delay
-                )
+                ports_delays_raw_shfqa.add(_uid_if_parameter(port_delay))
             if len(ports_delays_raw_shfqa) > 1:
                 msg = f"{signal_info.device.uid}: Multiple different `port_delay`s defined for SHFQA acquisition signals in `AcquisitionType.RAW` mode. Only 1 supported."
                 raise LabOneQException(msg)
@@ -850,10 +875,17 @@ def generate_recipe(
     precompensations: dict[str, PrecompensationInfo],
     combined_compiler_output: CombinedRTOutputSeqC,
 ) -> Recipe:
+    signal_infos = {
+        signal_id: experiment_dao.signal_info(signal_id)
+        for signal_id in experiment_dao.signals()
+    }
+    device_infos = experiment_dao.device_infos()
     recipe_generator = RecipeGenerator()
-    recipe_generator.from_experiment(experiment_dao, leader_properties, clock_settings)
+    recipe_generator.from_experiment(
+        experiment_dao, leader_properties, clock_settings, signal_infos, device_infos
+    )
 
-    recipe_generator.add_oscillator_params(experiment_dao)
+    recipe_generator.add_oscillator_params(signal_infos)
 
     for output in calc_outputs(
         experiment_dao,
@@ -898,7 +930,7 @@ def generate_recipe(
 
     for step in combined_compiler_output.neartime_steps:
         recipe_generator.add_neartime_execution_step(step)
-    for device in experiment_dao.device_infos():
+    for device in device_infos:
         recipe_generator.validate_and_postprocess_ios(device)
 
     for awg in awgs:
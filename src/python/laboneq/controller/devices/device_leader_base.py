@@ -31,6 +31,15 @@ class DeviceLeaderBase(DeviceBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._use_internal_clock = False
+        # The serial is fixed for the lifetime of the device
+        self._node_base = f"/{self.serial}/"
+        refclk_in = f"{self._node_base}system/clocks/referenceclock/in"
+        self._refclk_in_nodes = (
+            f"{refclk_in}/freq",
+            f"{refclk_in}/sourceactual",
+            f"{refclk_in}/source",
+            f"{refclk_in}/status",
+        )
 
     def update_clock_source(self, force_internal: bool | None):
         self._use_internal_clock = force_internal is True
@@ -42,36 +51,30 @@ class DeviceLeaderBase(DeviceBase):
             else ReferenceClockSourceLeader.EXTERNAL
         )
         expected_freq = None if self._use_internal_clock else 10e6
+        freq_node, source_actual_node, source_node, status_node = self._refclk_in_nodes
         return [
-            Condition(
-                f"/{self.serial}/system/clocks/referenceclock/in/freq", expected_freq
-            ),
-            Condition(
-                f"/{self.serial}/system/clocks/referenceclock/in/sourceactual", source
-            ),
-            Setting(f"/{self.serial}/system/clocks/referenceclock/in/source", source),
-            Response(f"/{self.serial}/system/clocks/referenceclock/in/status", 0),
+            Condition(freq_node, expected_freq),
+            Condition(source_actual_node, source),
+            Setting(source_node, source),
+            Response(status_node, 0),
         ]
 
     def zsync_link_control_nodes(self) -> list[NodeControlBase]:
         nodes = []
         enabled_zsyncs = {}
         for port, down_stream_devices in self._downlinks.items():
+            port_l = port.lower()
+            connection_base = f"{self._node_base}{port_l}/connection"
             # No command, these nodes will respond to the follower device switching to ZSync
-            nodes.append(
-                WaitCondition(f"/{self.serial}/{port.lower()}/connection/status", 2),
-            )
+            nodes.append(WaitCondition(f"{connection_base}/status", 2))
             for _, dev_ref in down_stream_devices:
-                dev = dev_ref()
-                if enabled_zsyncs.get(port.lower()) == dev.serial:
+                dev_serial = dev_ref().serial
+                if enabled_zsyncs.get(port_l) == dev_serial:
                     # Avoid double-enabling the port when it is connected to SHFQC
                     continue
-                enabled_zsyncs[port.lower()] = dev.serial
+                enabled_zsyncs[port_l] = dev_serial
                 nodes.append(
-                    WaitCondition(
-                        f"/{self.serial}/{port.lower()}/connection/serial",
-                        dev.serial[3:],
-                    ),
+                    WaitCondition(f"{connection_base}/serial", dev_serial[3:]),
                 )
 
         # Todo: Check if no ZSync ports are registered for synchronisation.
@@ -81,11 +84,15 @@ class DeviceLeaderBase(DeviceBase):
         return nodes
 
     async def configure_feedback(self, recipe_data: RecipeData):
-        nc = NodeCollector(base=f"/{self.serial}/")
+        nc = NodeCollector(base=self._node_base)
         min_wait_time = recipe_data.recipe.max_step_execution_time
         # This is required because PQSC/QHUB is only receiving the feedback events
         # during the holdoff time, even for a single trigger.
         nc.add("execution/holdoff", min_wait_time)
+        remote_feedback_awgs = recipe_data.awgs_receiving_remote_feedback()
+        if not remote_feedback_awgs:
+            await self.set_async(nc)
+            return
         enabled_zsyncs = set()
         for port, downstream_devices in self._downlinks.items():
             [p_kind, p_addr] = port.split("/")
@@ -97,12 +104,8 @@ class DeviceLeaderBase(DeviceBase):
                 follower = follower_ref()
                 if follower is None:
                     continue
-                for awg_key, awg_config in recipe_data.awg_configs.items():
-                    if (
-                        awg_key.device_uid != follower_uid
-                        or awg_config.source_feedback_register in (None, "local")
-                    ):
-                        continue  # Only consider devices receiving feedback from PQSC/QHUB
+                # Only consider devices receiving feedback from PQSC/QHUB
+                for awg_config in remote_feedback_awgs.get(follower_uid, ()):
                     if p_addr not in enabled_zsyncs:
                         nc.add(f"{zsync_output}/enable", 1)
                         nc.add(f"{zsync_output}/source", 0)
@@ -121,7 +124,7 @@ class DeviceLeaderBase(DeviceBase):
 
     async def start_execution(self, with_pipeliner: bool):
         _logger.debug("Starting execution...")
-        nc = NodeCollector(base=f"/{self.serial}/")
+        nc = NodeCollector(base=self._node_base)
 
         nc.add("triggers/out/0/enable", 1, cache=False)
 
@@ -158,7 +161,7 @@ class DeviceLeaderBase(DeviceBase):
                 timeout_s=1.0,
             )
             await rw.prepare()
-            nc = NodeCollector(base=f"/{self.serial}/")
+            nc = NodeCollector(base=self._node_base)
             nc.add("execution/synchronization/enable", 1)
             await self.set_async(nc)
             if len(await rw.wait()) > 0:
@@ -167,20 +170,20 @@ class DeviceLeaderBase(DeviceBase):
                 )
 
     async def teardown_one_step_execution(self, with_pipeliner: bool):
-        nc = NodeCollector(base=f"/{self.serial}/")
+        nc = NodeCollector(base=self._node_base)
         if with_pipeliner:
             nc.add("execution/synchronization/enable", 0)
         await self.set_async(nc)
 
     async def configure_trigger(self, recipe_data: RecipeData):
         initialization = recipe_data.get_initialization(self.device_qualifier.uid)
-        nc = NodeCollector(base=f"/{self.serial}/")
+        nc = NodeCollector(base=self._node_base)
         nc.add("system/clocks/referenceclock/out/enable", 1)
         nc.add("execution/repetitions", initialization.config.repetitions)
         await self.set_async(nc)
 
     async def reset_to_idle(self):
         await super().reset_to_idle()
-        nc = NodeCollector(base=f"/{self.serial}/")
+        nc = NodeCollector(base=self._node_base)
         nc.add("execution/synchronization/enable", 0, cache=False)
         await self.set_async(nc)
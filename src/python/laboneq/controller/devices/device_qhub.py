@@ -49,7 +49,7 @@ class DeviceQHUB(DeviceLeaderBase):
 
     async def reset_to_idle(self):
         await super().reset_to_idle()
-        nc = NodeCollector(base=f"/{self.serial}/")
+        nc = NodeCollector(base=self._node_base)
         # QHub does not automatically transition execution/enable to 0 (stop),
         # ensure it is on stop before we begin execution.
         nc.add("execution/enable", 0, cache=False)
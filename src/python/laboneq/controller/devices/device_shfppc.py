@@ -19,6 +19,31 @@ from laboneq.core.types.enums import AcquisitionType
 from laboneq.data.calibration import CancellationSource
 from laboneq.data.recipe import Initialization
 
+_RAD_TO_DEG = 180 / math.pi
+
+# each channel uses the neighboring channel's synthesizer for generating the pump tone
+_PROBE_SYNTH_CHANNEL = (1, 0, 3, 2)
+
+
+def _channel_node_paths(serial: str, ch: int) -> dict[str, str]:
+    base = f"/{serial}/ppchannels/{ch}"
+    return {
+        "pump_on": f"{base}/synthesizer/pump/on",
+        "pump_frequency": f"{base}/synthesizer/pump/freq",
+        "pump_power": f"{base}/synthesizer/pump/power",
+        "pump_filter_on": f"{base}/synthesizer/pump/filter",
+        "cancellation_on": f"{base}/cancellation/on",
+        "cancellation_source": f"{base}/cancellation/source",
+        "cancellation_source_frequency": f"{base}/cancellation/sourcefreq",
+        "cancellation_phase": f"{base}/cancellation/phaseshift",
+        "cancellation_attenuation": f"{base}/cancellation/attenuation",
+        "alc_on": f"{base}/synthesizer/pump/alc",
+        "probe_on": f"{base}/synthesizer/probe/on",
+        "probe_frequency": f"{base}/synthesizer/probe/freq",
+        "probe_power": f"{base}/synthesizer/probe/power",
+        "sweep_config": f"{base}/sweeper/json/data",
+    }
+
 
 class DeviceSHFPPC(DeviceBase):
     attribute_keys = {
@@ -29,6 +54,9 @@ class DeviceSHFPPC(DeviceBase):
         "probe_frequency": AttributeName.PPC_PROBE_FREQUENCY,
         "probe_power": AttributeName.PPC_PROBE_POWER,
     }
+    # Not written at initialization: the channel index itself, and the values bound
+    # to sweep params, which will be set during the NT execution.
+    _skipped_initialization_keys = frozenset(["channel", *attribute_keys])
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -36,7 +64,10 @@ class DeviceSHFPPC(DeviceBase):
         self.dev_opts = []
         self._use_internal_clock = False
         self._channels = 4
-        self._allocated_sweepers = set()
+        # channel -> (sweeper enable node, not started message, not stopped message)
+        self._allocated_sweepers: dict[int, tuple[str, str, str]] = {}
+        # channel -> recipe key -> node path
+        self._node_paths: dict[int, dict[str, str]] = {}
 
     def is_follower(self):
         return True
@@ -53,23 +84,10 @@ class DeviceSHFPPC(DeviceBase):
             raise ValueError(f"Invalid device type: {self.dev_type}")
 
     def _key_to_path(self, key: str, ch: int):
-        keys_to_paths = {
-            "pump_on": f"/{self.serial}/ppchannels/{ch}/synthesizer/pump/on",
-            "pump_frequency": f"/{self.serial}/ppchannels/{ch}/synthesizer/pump/freq",
-            "pump_power": f"/{self.serial}/ppchannels/{ch}/synthesizer/pump/power",
-            "pump_filter_on": f"/{self.serial}/ppchannels/{ch}/synthesizer/pump/filter",
-            "cancellation_on": f"/{self.serial}/ppchannels/{ch}/cancellation/on",
-            "cancellation_source": f"/{self.serial}/ppchannels/{ch}/cancellation/source",
-            "cancellation_source_frequency": f"/{self.serial}/ppchannels/{ch}/cancellation/sourcefreq",
-            "cancellation_phase": f"/{self.serial}/ppchannels/{ch}/cancellation/phaseshift",
-            "cancellation_attenuation": f"/{self.serial}/ppchannels/{ch}/cancellation/attenuation",
-            "alc_on": f"/{self.serial}/ppchannels/{ch}/synthesizer/pump/alc",
-            "probe_on": f"/{self.serial}/ppchannels/{ch}/synthesizer/probe/on",
-            "probe_frequency": f"/{self.serial}/ppchannels/{ch}/synthesizer/probe/freq",
-            "probe_power": f"/{self.serial}/ppchannels/{ch}/synthesizer/probe/power",
-            "sweep_config": f"/{self.serial}/ppchannels/{ch}/sweeper/json/data",
-        }
-        return keys_to_paths[key]
+        paths = self._node_paths.get(ch)
+        if paths is None:
+            paths = self._node_paths[ch] = _channel_node_paths(self.serial, ch)
+        return paths[key]
 
     def update_clock_source(self, force_internal: bool | None):
         self._use_internal_clock = force_internal is True
@@ -81,6 +99,8 @@ class DeviceSHFPPC(DeviceBase):
         yield from super().pre_process_attributes(initialization)
         ppchannels = initialization.ppchannels or []
         for settings in ppchannels:
+            if settings.keys().isdisjoint(DeviceSHFPPC.attribute_keys):
+                continue  # No attribute-backed settings on this channel
             channel = settings["channel"]
             for key, attribute_name in DeviceSHFPPC.attribute_keys.items():
                 if key in settings:
@@ -103,27 +123,28 @@ class DeviceSHFPPC(DeviceBase):
         }
 
         def _convert(value):
-            if isinstance(value, bool):
-                return 1 if value else 0
+            if value is True or value is False:
+                return int(value)
             return value
 
-        # each channel uses the neighboring channel's synthesizer for generating the pump tone
-        probe_synth_channel = [1, 0, 3, 2]
+        for ch, settings in ppchannels.items():
+            if not settings.get("probe_on"):
+                continue
+            probe_synth_channel = _PROBE_SYNTH_CHANNEL[ch]
+            probe_channel = ppchannels.get(probe_synth_channel)
+            if probe_channel is not None and probe_channel["pump_on"]:
+                raise LabOneQControllerException(
+                    f"{self.dev_repr}: cannot use probe tone on"
+                    f" channel {ch} while the pump tone generation is also"
+                    f" enabled on channel {probe_synth_channel}"
+                )
 
         self._allocated_sweepers.clear()
         for ch, settings in ppchannels.items():
             for key, value in settings.items():
-                if key == "channel":
+                if key in DeviceSHFPPC._skipped_initialization_keys:
                     continue
-                if key == "probe_on" and value:
-                    probe_channel = ppchannels.get(probe_synth_channel[ch])
-                    if probe_channel is not None and probe_channel["pump_on"]:
-                        raise LabOneQControllerException(
-                            f"{self.dev_repr}: cannot use probe tone on"
-                            f" channel {ch} while the pump tone generation is also"
-                            f" enabled on channel {probe_synth_channel[ch]}"
-                        )
-                elif key == "cancellation_source":
+                if key == "cancellation_source":
                     if value == CancellationSource.INTERNAL:
                         value = 0
                     else:
@@ -135,13 +156,18 @@ class DeviceSHFPPC(DeviceBase):
                                 f" cancellation source requires specifying the"
                                 f" cancellation frequency"
                             )
-                if value is None or key in DeviceSHFPPC.attribute_keys:
-                    # Skip not set values, or values that are bound to sweep params and will
-                    # be set during the NT execution.
+                elif value is None:
                     continue
-                if key == "sweep_config":
-                    self._allocated_sweepers.add(ch)
+                elif key == "sweep_config":
+                    self._allocated_sweepers[ch] = (
+                        f"/{self.serial}/ppchannels/{ch}/sweeper/enable",
+                        f"{self.dev_repr}: Sweeper {ch} didn't start.",
+                        f"{self.dev_repr}: Sweeper on channel {ch} didn't stop."
+                        " Check trigger connection.",
+                    )
                 nc.add(self._key_to_path(key, ch), _convert(value))
+        # Keep the sweepers in channel order, so they are started in that order
+        self._allocated_sweepers = dict(sorted(self._allocated_sweepers.items()))
         await self.set_async(nc)
 
     def _collect_prepare_nt_step_nodes(
@@ -152,28 +178,25 @@ class DeviceSHFPPC(DeviceBase):
         for ch in range(self._channels):
             for key, attr_name in DeviceSHFPPC.attribute_keys.items():
                 [value], updated = attributes.resolve(keys=[(attr_name, ch)])
+                if not updated:
+                    continue
                 if value is not None and key == "cancellation_phase":
-                    value *= 180 / math.pi
-                if updated:
-                    path = self._key_to_path(key, ch)
-                    nc.add(path, value)
+                    value *= _RAD_TO_DEG
+                nc.add(self._key_to_path(key, ch), value)
         return nc
 
     async def start_execution(self, with_pipeliner: bool):
-        nc = NodeCollector(base=f"/{self.serial}/")
-        for channel in sorted(self._allocated_sweepers):
-            nc.add(f"ppchannels/{channel}/sweeper/enable", 1, cache=False)
+        nc = NodeCollector()
+        for node, _, _ in self._allocated_sweepers.values():
+            nc.add(node, 1, cache=False)
         await self.set_async(nc)
 
     def conditions_for_execution_ready(
         self, with_pipeliner: bool
     ) -> dict[str, tuple[Any, str]]:
         conditions = {
-            f"/{self.serial}/ppchannels/{channel}/sweeper/enable": (
-                1,
-                f"{self.dev_repr}: Sweeper {channel} didn't start.",
-            )
-            for channel in self._allocated_sweepers
+            node: (1, not_started_msg)
+            for node, not_started_msg, _ in self._allocated_sweepers.values()
         }
         return conditions
 
@@ -181,10 +204,7 @@ class DeviceSHFPPC(DeviceBase):
         self, acquisition_type: AcquisitionType, with_pipeliner: bool
     ) -> dict[str, tuple[Any, str]]:
         conditions = {
-            f"/{self.serial}/ppchannels/{sweeper_index}/sweeper/enable": (
-                0,
-                f"{self.dev_repr}: Sweeper on channel {sweeper_index} didn't stop. Check trigger connection.",
-            )
-            for sweeper_index in self._allocated_sweepers
+            node: (0, not_stopped_msg)
+            for node, _, not_stopped_msg in self._allocated_sweepers.values()
         }
         return conditions
@@ -189,6 +189,14 @@ class RecipeData:
             if awg_config.result_length is not None:
                 yield awg_key, awg_config
 
+    def awgs_receiving_remote_feedback(self) -> dict[DeviceUID, list[AwgConfig]]:
+        """AWGs fed back from the PQSC/QHUB register bank, grouped by device."""
+        awgs: dict[DeviceUID, list[AwgConfig]] = {}
+        for awg_key, awg_config in self.awg_configs.items():
+            if awg_config.source_feedback_register not in (None, "local"):
+                awgs.setdefault(awg_key.device_uid, []).append(awg_config)
+        return awgs
+
     def awg_config_by_acquire_signal(self, signal_id: str) -> AwgConfig | None:
         return next(
             (
@@ -1,27 +1,51 @@
 # Copyright 2023 Zurich Instruments AG
 # SPDX-License-Identifier: Apache-2.0
 
-from laboneq.data.experiment_description import Experiment, PlayPulse
+from __future__ import annotations
 
-PULSES = {}
+from contextvars import ContextVar
 
+from laboneq.data.experiment_description import Experiment, PlayPulse
 
-def post_process(source, target, conversion_function_lookup: dict):
-    global PULSES
+# Pulses converted since the last experiment was completed, keyed by pulse UID.
+# Held in a context variable so that conversions in different threads (or tasks)
+# do not mix their pulses.
+_PULSES: ContextVar[dict | None] = ContextVar("_PULSES", default=None)
 
-    # todo(Pol): replace both of these by Pulse?
 
-    if type(target) is Experiment:
-        target.pulses = list(PULSES.values())
-        PULSES = {}
-        return target
-    elif type(target) is PlayPulse:
-        if source.pulse is not None:
-            if source.pulse.uid not in PULSES:
-                PULSES[source.pulse.uid] = conversion_function_lookup.get(
-                    type(source.pulse)
-                )(source.pulse)
-            target.pulse = PULSES[source.pulse.uid]
-        target.signal = source.signal
+def _post_process_experiment(source, target: Experiment, conversion_function_lookup):
+    pulses = _PULSES.get()
+    target.pulses = [] if pulses is None else list(pulses.values())
+    _PULSES.set(None)
+    return target
+
 
+def _post_process_play_pulse(source, target: PlayPulse, conversion_function_lookup):
+    if source.pulse is not None:
+        pulses = _PULSES.get()
+        if pulses is None:
+            pulses = {}
+            _PULSES.set(pulses)
+        pulse_uid = source.pulse.uid
+        pulse = pulses.get(pulse_uid)
+        if pulse is None:
+            pulse = pulses[pulse_uid] = conversion_function_lookup.get(
+                type(source.pulse)
+            )(source.pulse)
+        target.pulse = pulse
+    target.signal = source.signal
     return target
+
+
+# todo(Pol): replace both of these by Pulse?
+_POST_PROCESSORS = {
+    Experiment: _post_process_experiment,
+    PlayPulse: _post_process_play_pulse,
+}
+
+
+def post_process(source, target, conversion_function_lookup: dict):
+    post_processor = _POST_PROCESSORS.get(type(target))
+    if post_processor is None:
+        return target
+    return post_processor(source, target, conversion_function_lookup)
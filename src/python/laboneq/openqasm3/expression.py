@@ -54,23 +54,37 @@ constants = {
 }
 
 
-def duration_to_seconds(duration: ast.DurationLiteral):
-    val = duration.value
-    scale = {
-        ast.TimeUnit.s: 1,
-        ast.TimeUnit.ms: 1e-3,
-        ast.TimeUnit.us: 1e-6,
-        ast.TimeUnit.ns: 1e-9,
-    }
+_duration_scale = {
+    ast.TimeUnit.s: 1,
+    ast.TimeUnit.ms: 1e-3,
+    ast.TimeUnit.us: 1e-6,
+    ast.TimeUnit.ns: 1e-9,
+}
+
 
+def duration_to_seconds(duration: ast.DurationLiteral):
     if duration.unit == ast.TimeUnit.dt:
         raise OpenQasmException("Backend-dependent duration not supported")
-    return val * scale[duration.unit]
+    return duration.value * _duration_scale[duration.unit]
+
+
+# Literal node types whose value is stored on the node as-is
+_plain_literal_types = frozenset(
+    (
+        ast.IntegerLiteral,
+        ast.FloatLiteral,
+        ast.BooleanLiteral,
+        ast.BitstringLiteral,
+    )
+)
 
 
 def _eval_expression(
     expression: ast.Expression | ast.DiscreteSet, namespace: NamespaceStack
 ):
+    if type(expression) in _plain_literal_types:
+        return expression.value
+
     if isinstance(
         expression,
         (
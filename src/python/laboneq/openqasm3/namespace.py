@@ -6,7 +6,7 @@ from __future__ import annotations
 import abc
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 from laboneq.dsl.experiment.pulse import Pulse, PulseSampled
 from laboneq.openqasm3.openqasm_error import OpenQasmException
 
@@ -109,6 +109,13 @@ class BaseNamespace(abc.ABC):
     @abc.abstractmethod
     def declare_classical_value(self, name, value): ...
 
+    def declare_classical_values(self, names_and_values: Iterable[tuple[str, Any]]):
+        """Declare several classical values, one `declare_classical_value` each."""
+        return [
+            self.declare_classical_value(name, value)
+            for name, value in names_and_values
+        ]
+
     @abc.abstractmethod
     def declare_port(self, name: str, qubit: str, value: str) -> Port:
         """Declare abstract port."""
@@ -166,6 +173,20 @@ class DefaultNamespace(BaseNamespace):
         # TODO: Enforce constantness of constants. Currently they are implemented as variables
         return self.declare_reference(name, value)
 
+    def declare_classical_values(
+        self, names_and_values: Iterable[tuple[str, Any]]
+    ) -> list[ClassicalRef]:
+        """Declare several scalar classical values at once.
+
+        Values must be neither references nor lists (e.g. the bits of a register),
+        so the refs can be created directly and added in a single scope update.
+        """
+        refs = [ClassicalRef(name, value) for name, value in names_and_values]
+        for ref in refs:
+            self._check_duplicate(ref.canonical_name)
+        self.local_scope.update((ref.canonical_name, ref) for ref in refs)
+        return refs
+
     def declare_port(self, name: str, qubit: str, value: str) -> Port:
         self._check_duplicate(name)
         self.local_scope[name] = Port(canonical_name=name, qubit=qubit, value=value)
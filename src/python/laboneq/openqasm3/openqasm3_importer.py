@@ -3,6 +3,8 @@
 
 from __future__ import annotations
 
+import copy
+import functools
 import warnings
 from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any, Callable
@@ -32,6 +34,17 @@ if TYPE_CHECKING:
     from laboneq.openqasm3.gate_store import GateStore
 
 
+_EXTERN_PORT_RE = re.compile(r"extern port (\S+);")
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_program(text: str) -> ast.Program:
+    # Shared between callers: the transpiler only reads the tree.
+    tree = openpulse.parse(text)
+    assert isinstance(tree, ast.Program)
+    return tree
+
+
 def _unwrap_qubit_register(name: str, size: int) -> list[str]:
     """Unwrap a QASM qubit register into a list of single qubits."""
     # Qubit register has a special convention
@@ -103,7 +116,7 @@ class OpenQasm3Importer:
         self,
         text: str,
     ) -> Section:
-        tree = self.program_to_ast(text)
+        tree = _parse_program(self._preprocess(text))
         try:
             return self.transpile(tree, uid_hint="root")
         except OpenQasmException as e:
@@ -112,15 +125,11 @@ class OpenQasm3Importer:
 
     def program_to_ast(self, text: str) -> ast.Program:
         """Convert OpenQASM program into an AST tree."""
-        text = self._preprocess(text)
-        tree = openpulse.parse(text)
-        assert isinstance(tree, ast.Program)
-        return tree
+        return copy.deepcopy(_parse_program(self._preprocess(text)))
 
     def _workaround_extern_port(self, text: str) -> str:
         # NOTE: 'extern port' declaration is not yet supported by the openpulse parser.
-        pattern = r"extern port (\S+);"
-        return re.sub(pattern, r"port \1;", text)
+        return _EXTERN_PORT_RE.sub(r"port \1;", text)
 
     def _preprocess(self, text: str) -> str:
         return self._workaround_extern_port(text)
@@ -10,6 +10,8 @@ from laboneq.dsl.calibration import Calibration
 class MeasurementResult:
     """An internal holder for measurement results."""
 
+    __slots__ = ("handle",)
+
     def __init__(self, handle: str):
         self.handle = handle
 
@@ -44,6 +46,8 @@ class ExternResult:
 
     """
 
+    __slots__ = ("result", "handle", "section")
+
     def __init__(self, result=None, handle=None, section=None):
         self.result = result
         self.handle = handle
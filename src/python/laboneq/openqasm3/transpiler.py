@@ -370,6 +370,7 @@ class OpenQASMTranspiler:
         else:
             options = options or MultiProgramOptions()
 
+        n_programs = len(programs)
         batch_execution_mode = options.batch_execution_mode
         pipeline_chunk_count = options.pipeline_chunk_count
         importer = openqasm3_importer.OpenQasm3Importer(
@@ -381,8 +382,8 @@ class OpenQASMTranspiler:
 
         if batch_execution_mode == "pipeline":
             if pipeline_chunk_count is None:
-                pipeline_chunk_count = len(programs)
-            if len(programs) % pipeline_chunk_count != 0:
+                pipeline_chunk_count = n_programs
+            if n_programs % pipeline_chunk_count != 0:
                 # The underlying limitation is that the structure of the acquisitions
                 # must be the same in each chunk, because the compiled experiment
                 # recipe only supplies the acquisition information once, rather than
@@ -390,7 +391,7 @@ class OpenQASMTranspiler:
                 # per-chunk execution information and the controller updated to apply
                 # this, then this restriction can be removed.
                 raise ValueError(
-                    f"Number of programs ({len(programs)}) not divisible"
+                    f"Number of programs ({n_programs}) not divisible"
                     f" by pipeline_chunk_count ({pipeline_chunk_count})",
                 )
 
@@ -402,8 +403,8 @@ class OpenQASMTranspiler:
         experiment_index = parameter.LinearSweepParameter(
             uid="index",
             start=0,
-            stop=len(programs) - 1,
-            count=len(programs),
+            stop=n_programs - 1,
+            count=n_programs,
         )
 
         if batch_execution_mode == "nt":
@@ -553,7 +554,7 @@ def _experiment_signals(qubit_register: dict) -> list[ExperimentSignal]:
         LabOneQException: Signal with the same id is already assigned.
     """
 
-    signals = []
+    signals = {}
     for qubit in qubit_register.values():
         if isinstance(qubit, list):
             nested_qubits = qubit
@@ -561,11 +562,11 @@ def _experiment_signals(qubit_register: dict) -> list[ExperimentSignal]:
             nested_qubits = [qubit]
         for q in nested_qubits:
             for exp_signal in q.experiment_signals():
-                if exp_signal in signals:
+                if exp_signal.uid in signals:
                     msg = f"Signal with id {exp_signal.uid} already assigned."
                     raise LabOneQException(msg)
-                signals.append(exp_signal)
-    return signals
+                signals[exp_signal.uid] = exp_signal
+    return list(signals.values())
 
 
 def _flatten_qubits(qubit_register: dict) -> list[QuantumElement]:
@@ -9,9 +9,8 @@ import openqasm3.visitor
 from openqasm3.ast import QASMNode
 
 import copy
-import math
+import functools
 import operator
-import re
 from typing import Any, Callable, Union, TYPE_CHECKING
 from laboneq.openqasm3 import namespace
 from openpulse import ast
@@ -101,6 +100,19 @@ def _convert_openpulse_span(base_span, relative_span, prefix_length):
     )
 
 
+# Assignment operator -> function of (old value, rvalue)
+_ASSIGNMENT_OPS: dict[str, Callable[[Any, Any], Any]] = {
+    "=": lambda a, b: b,
+    "*=": operator.mul,
+    "/=": operator.truediv,
+    "+=": operator.add,
+    "-=": operator.sub,
+}
+
+# (visitor class, node type) -> unbound visitor method
+_VISITOR_METHODS: dict[tuple[type, type], Callable] = {}
+
+
 class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
     def __init__(
         self,
@@ -125,6 +137,8 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
         self.supplied_inputs = inputs or {}
         self.supplied_externs = externs or {}
         self._program_gates = {}
+        # Signal path -> qubit name, built on first use
+        self._qubit_names_by_signal: dict[str, str] | None = None
 
     def _register_gate_section(
         self, name: str, qubit_names: list[str], section_factory: Callable[..., Section]
@@ -177,8 +191,9 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             err_msg = f"Qubit(s) {qubits} not supplied."
             raise OpenQasmException(err_msg, mark=loc) from None
         if not broadcast:
-            if (name, tuple(qubits)) in self._program_gates:
-                return self._program_gates[(name, tuple(qubits))](*args, **kwargs)
+            program_gate = self._program_gates.get((name, tuple(qubits)))
+            if program_gate is not None:
+                return program_gate(*args, **kwargs)
         gate_callable = self._retrieve_gate(loc, name, qubits)
 
         secs = gate_callable(*qubit_args, *args, **kwargs)
@@ -186,18 +201,40 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             return Section(uid=id_generator(f"{name}_broadcast"), children=secs)
         return secs
 
-    def _has_frame(self, qubits_or_frames) -> bool:
-        return any(isinstance(f, Frame) for f in qubits_or_frames)
+    def _qubit_name_from_signal(self, signal_path: str) -> str | None:
+        """The name of the first qubit that has the given signal, if any."""
+        if self._qubit_names_by_signal is None:
+            self._qubit_names_by_signal = {}
+            for qname, qubit in self.qubits.items():
+                for path in qubit.signals.values():
+                    self._qubit_names_by_signal.setdefault(path, qname)
+        return self._qubit_names_by_signal.get(signal_path)
 
-    def _frame_to_qubit(self, qubits_or_frames) -> list[str]:
-        if all(isinstance(f, Frame) for f in qubits_or_frames):
-            return [
-                self.namespace.lookup(frame.port).qubit for frame in qubits_or_frames
-            ]
-        elif any(isinstance(f, Frame) for f in qubits_or_frames):
+    def _frame_to_qubit(self, qubits_or_frames: list) -> list[str] | None:
+        """Map frame operands to their qubit names.
+
+        Returns None if no operand is a frame.
+        """
+        frames = [f for f in qubits_or_frames if isinstance(f, Frame)]
+        if not frames:
+            return None
+        if len(frames) != len(qubits_or_frames):
             msg = "Cannot mix frames and qubits."
             raise OpenQasmException(msg)
-        return None
+        return [self.namespace.lookup(frame.port).qubit for frame in frames]
+
+    def visit(self, node: QASMNode, context=None):
+        # Same dispatch as QASMVisitor.visit, but the visitor method is resolved
+        # once per (visitor class, node type) instead of on every node.
+        key = (type(self), type(node))
+        visitor = _VISITOR_METHODS.get(key)
+        if visitor is None:
+            visitor = _VISITOR_METHODS[key] = getattr(
+                type(self), "visit_" + type(node).__name__, type(self).generic_visit
+            )
+        if context:
+            return visitor(self, node, context)
+        return visitor(self, node)
 
     def generic_visit(self, node: QASMNode, context=None):
         raise OpenQasmException(
@@ -357,83 +394,100 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
         self,
         statement: ast.ClassicalDeclaration,
     ) -> None:
+        declare = self._classical_declaration_handlers.get(
+            type(statement.type), TranspilerVisitor._declare_classical_value
+        )
+        declare(self, statement)
+
+    def _declare_bit(self, statement: ast.ClassicalDeclaration) -> None:
+        namespace = self.namespace
         name = statement.identifier.name
-        if isinstance(statement.type, ast.BitType):
-            if statement.init_expression is not None:
-                value = eval_expression(
-                    statement.init_expression,
-                    namespace=self.namespace,
-                    type_=int,
-                )
-            else:
-                value = None
-            size = statement.type.size
-            if size is not None:
-                size = eval_expression(size, namespace=self.namespace, type_=int)
-
-                # declare the individual bits...
-                bits = [
-                    self.namespace.current.declare_classical_value(
-                        f"{name}[{i}]",
-                        value=bool((value >> i) & 1) if value is not None else None,
-                    )
-                    for i in range(size)
-                ]
-                # ... as well as a list aliasing them
-                self.namespace.current.declare_reference(name, bits)
-            else:
-                self.namespace.current.declare_classical_value(name, value)
-        elif isinstance(statement.type, ast.FrameType):
-            init = statement.init_expression
-            if not isinstance(init, ast.FunctionCall) or init.name.name != "newframe":
-                msg = "Frame type initializer must be a 'newframe' function call."
-                raise OpenQasmException(msg, mark=statement.span)
-            name = statement.identifier.name
-            freq = eval_expression(
-                statement.init_expression.arguments[1],
-                namespace=self.namespace,
-                type_=(float, int, SweepParameter),
-            )
-            phase = eval_expression(
-                statement.init_expression.arguments[2],
-                namespace=self.namespace,
-                type_=(float, SweepParameter),
-            )
-            port = self.namespace.lookup(statement.init_expression.arguments[0].name)
-            self.namespace.current.declare_frame(name, port.canonical_name, freq, phase)
-        elif isinstance(statement.type, ast.WaveformType):
-            # waveforms can be declared only in cal blocks.
+        if statement.init_expression is not None:
             value = eval_expression(
                 statement.init_expression,
-                namespace=self.namespace,
-                # TODO: type_=waveform-type,
-                # waveform w = extern_waveform(...) would return arbitrary type.
-                # We need to handle this better.
+                namespace=namespace,
+                type_=int,
             )
-            self.namespace.current.declare_waveform(name, value)
-        elif isinstance(statement.type, ast.PortType):
-            try:
-                signal_path = self.supplied_externs[name]
-            except KeyError:
-                msg = f"Port {name!r} not provided."
-                raise OpenQasmException(msg) from None
-            for qname, qubit in self.qubits.items():
-                if signal_path in qubit.signals.values():
-                    self.namespace.current.declare_port(name, qname, signal_path)
-                    break
-            else:
-                msg = f"Port {name} maps to non-existed signal {signal_path}."
-                raise ValueError(msg)
         else:
-            # TODO: We should set a clear boundary on what types are supported here
-            # else should raise an exception
-            if statement.init_expression is not None:
-                value = eval_expression(
-                    statement.init_expression, namespace=self.namespace
+            value = None
+        size = statement.type.size
+        if size is not None:
+            size = eval_expression(size, namespace=namespace, type_=int)
+
+            # declare the individual bits...
+            bits = namespace.current.declare_classical_values(
+                (
+                    f"{name}[{i}]",
+                    bool((value >> i) & 1) if value is not None else None,
                 )
-            else:
-                value = None
-            self.namespace.current.declare_classical_value(name, value)
+                for i in range(size)
+            )
+            # ... as well as a list aliasing them
+            namespace.current.declare_reference(name, bits)
+        else:
+            namespace.current.declare_classical_value(name, value)
+
+    def _declare_frame(self, statement: ast.ClassicalDeclaration) -> None:
+        namespace = self.namespace
+        init = statement.init_expression
+        if not isinstance(init, ast.FunctionCall) or init.name.name != "newframe":
+            msg = "Frame type initializer must be a 'newframe' function call."
+            raise OpenQasmException(msg, mark=statement.span)
+        name = statement.identifier.name
+        freq = eval_expression(
+            init.arguments[1],
+            namespace=namespace,
+            type_=(float, int, SweepParameter),
+        )
+        phase = eval_expression(
+            init.arguments[2],
+            namespace=namespace,
+            type_=(float, SweepParameter),
+        )
+        port = namespace.lookup(init.arguments[0].name)
+        namespace.current.declare_frame(name, port.canonical_name, freq, phase)
+
+    def _declare_waveform(self, statement: ast.ClassicalDeclaration) -> None:
+        # waveforms can be declared only in cal blocks.
+        value = eval_expression(
+            statement.init_expression,
+            namespace=self.namespace,
+            # TODO: type_=waveform-type,
+            # waveform w = extern_waveform(...) would return arbitrary type.
+            # We need to handle this better.
+        )
+        self.namespace.current.declare_waveform(statement.identifier.name, value)
+
+    def _declare_port(self, statement: ast.ClassicalDeclaration) -> None:
+        name = statement.identifier.name
+        try:
+            signal_path = self.supplied_externs[name]
+        except KeyError:
+            msg = f"Port {name!r} not provided."
+            raise OpenQasmException(msg) from None
+        qname = self._qubit_name_from_signal(signal_path)
+        if qname is None:
+            msg = f"Port {name} maps to non-existed signal {signal_path}."
+            raise ValueError(msg)
+        self.namespace.current.declare_port(name, qname, signal_path)
+
+    def _declare_classical_value(self, statement: ast.ClassicalDeclaration) -> None:
+        # TODO: We should set a clear boundary on what types are supported here
+        # else should raise an exception
+        namespace = self.namespace
+        if statement.init_expression is not None:
+            value = eval_expression(statement.init_expression, namespace=namespace)
+        else:
+            value = None
+        namespace.current.declare_classical_value(statement.identifier.name, value)
+
+    # Declaration type -> handler; any other type is declared as a plain value
+    _classical_declaration_handlers = {
+        ast.BitType: _declare_bit,
+        ast.FrameType: _declare_frame,
+        ast.WaveformType: _declare_waveform,
+        ast.PortType: _declare_port,
+    }
 
     def _handle_io_declaration(self, statement: ast.IODeclaration):
         # The openqasm parse itself checks that IODeclarations
@@ -530,9 +584,9 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
         return tuple(qubit_names)
 
     def _handle_quantum_gate(self, statement: ast.QuantumGate):
+        namespace = self.namespace
         args = tuple(
-            eval_expression(arg, namespace=self.namespace)
-            for arg in statement.arguments
+            [eval_expression(arg, namespace=namespace) for arg in statement.arguments]
         )
         if statement.modifiers or statement.duration:
             msg = "Gate modifiers and duration not yet supported."
@@ -542,9 +596,7 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             raise OpenQasmException(msg, mark=statement.span)
 
         name = statement.name.name
-        qubits = [
-            eval_expression(q, namespace=self.namespace) for q in statement.qubits
-        ]
+        qubits = [eval_expression(q, namespace=namespace) for q in statement.qubits]
         try:
             qubit_names = self._process_qubit_register(qubits)
         except (ValueError, TypeError) as e:
@@ -571,9 +623,10 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             qubits_or_frames = [
                 eval_expression(q, namespace=self.namespace) for q in statement.qubits
             ]
-            if self._has_frame(qubits_or_frames):
+            frame_qubits = self._frame_to_qubit(qubits_or_frames)
+            if frame_qubits is not None:
                 # Avoid duplicate qubits due to openpulse frames
-                qubits = tuple(dict.fromkeys(self._frame_to_qubit(qubits_or_frames)))
+                qubits = tuple(dict.fromkeys(frame_qubits))
             else:
                 qubits = self._process_qubit_register(qubits_or_frames)
         # force barrier to be broadcasted if more than one qubit are given
@@ -615,6 +668,17 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
         defcal_name = statement.name.name
         qubit_names = tuple(q.name for q in statement.qubits)
 
+        @functools.cache
+        def reserved_signals() -> tuple[str, ...]:
+            # The signals of the defcal qubits, collected on the first gate call
+            return tuple(
+                dict.fromkeys(
+                    exp_signal.mapped_logical_signal_path
+                    for qubit in qubit_names
+                    for exp_signal in self.qubits[qubit].experiment_signals()
+                )
+            )
+
         def gate_factory(*args, **kwargs):
             with self.namespace.new_scope():
                 resolved_args = {}
@@ -656,12 +720,7 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
                     )
                     raise
 
-                reserved_qubits = [self.qubits[qubit] for qubit in qubit_names]
-                reserved_signals = set()
-                for qubit in reserved_qubits:
-                    for exp_signal in qubit.experiment_signals():
-                        reserved_signals.add(exp_signal.mapped_logical_signal_path)
-                for signal in reserved_signals:
+                for signal in reserved_signals():
                     section.reserve(signal)
 
                 return section
@@ -721,12 +780,13 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
         raise OpenQasmException(msg)
 
     def _handle_play(self, expr: ast.FunctionCall):
-        frame: Frame = eval_expression(expr.arguments[0], namespace=self.namespace)
+        namespace = self.namespace
+        frame: Frame = eval_expression(expr.arguments[0], namespace=namespace)
         arg1 = expr.arguments[1]
         if isinstance(arg1, ast.FunctionCall):
             if arg1.name.name == "scale":
                 waveform = arg1.arguments[1].name
-                amplitude = eval_expression(arg1.arguments[0], namespace=self.namespace)
+                amplitude = eval_expression(arg1.arguments[0], namespace=namespace)
             else:
                 msg = "Currently only 'scale' is supported as a play waveform modifier function."
                 raise OpenQasmException(msg, mark=expr.span)
@@ -736,7 +796,7 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
         pulse = self._get_waveform(waveform)
         sect = Section(uid=id_generator(f"play_{frame.port}"))
         sect.play(
-            signal=self.namespace.lookup(frame.port).value,
+            signal=namespace.lookup(frame.port).value,
             pulse=pulse,
             amplitude=amplitude,
         )
@@ -744,11 +804,12 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
 
     def _handle_set_frequency(self, expr: ast.FunctionCall):
         assert len(expr.arguments) == 2
-        frame = eval_expression(expr.arguments[0], namespace=self.namespace)
-        signal = self.namespace.lookup(frame.port).value
+        namespace = self.namespace
+        frame = eval_expression(expr.arguments[0], namespace=namespace)
+        signal = namespace.lookup(frame.port).value
         freq = eval_expression(
             expr.arguments[1],
-            namespace=self.namespace,
+            namespace=namespace,
             type_=(float, int, SweepParameter, ast.ClassicalArgument),
         )
 
@@ -778,13 +839,15 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             for qubit in statement.qubits
         ]
         # OpenPulse allows for delaying only some of a qubit's signals
-        selective_frame_delay = False
+        qubit_names = self._frame_to_qubit(qubits_or_frames)
+        selective_frame_delay = qubit_names is not None
 
-        if self._has_frame(qubits_or_frames):
-            # Avoid duplicate qubits due to openpulse frames
-            selective_frame_delay = True
-            qubit_names = self._frame_to_qubit(qubits_or_frames)
+        if selective_frame_delay:
+            frame_signals = [
+                self.namespace.lookup(frame.port).value for frame in qubits_or_frames
+            ]
         else:
+            frame_signals = []
             nested_qubit_names = self._process_qubit_register(qubits_or_frames)
             # no broadcasting for delay operation
             # so we need to flatten the qubit names
@@ -806,11 +869,8 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             # TODO: (convention was for regular pulse sheets, but inconsistent with spectroscopy)
             # TODO: What should happen for custom qubit types?
             if selective_frame_delay:
-                for frame in qubits_or_frames:
-                    delay_section.delay(
-                        signal=self.namespace.lookup(frame.port).value,
-                        time=duration,
-                    )
+                for signal in frame_signals:
+                    delay_section.delay(signal=signal, time=duration)
             else:
                 # TODO: Use the quantum operation delay
                 if "drive" in dsl_qubit.signals:
@@ -825,28 +885,24 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
 
     def _handle_branching_statement(self, statement: ast.BranchingStatement):
         condition = eval_expression(statement.condition, namespace=self.namespace)
-        if_block = None
-        if statement.if_block:
-            if_block = ast.Box(body=statement.if_block, duration=None)
-        else_block = None
-        if statement.else_block:
-            else_block = ast.Box(body=statement.else_block, duration=None)
-
-        if isinstance(condition, Parameter):
-            raise OpenQasmException(
-                "Branching on a sweep parameter is not"
-                " yet supported by the LabOne Q OpenQASM importer.",
-                mark=statement.condition.span,
-            )
-
-        if isinstance(condition, MeasurementResult):
-            raise OpenQasmException(
-                "Branching on a measurement result is not"
-                " yet supported by the LabOne Q OpenQASM importer.",
-                mark=statement.condition.span,
-            )
 
+        # Numeric conditions (including bool) are the only ones supported;
+        # classify anything else only to pick the error message.
         if not isinstance(condition, (int, float)):
+            if isinstance(condition, Parameter):
+                raise OpenQasmException(
+                    "Branching on a sweep parameter is not"
+                    " yet supported by the LabOne Q OpenQASM importer.",
+                    mark=statement.condition.span,
+                )
+
+            if isinstance(condition, MeasurementResult):
+                raise OpenQasmException(
+                    "Branching on a measurement result is not"
+                    " yet supported by the LabOne Q OpenQASM importer.",
+                    mark=statement.condition.span,
+                )
+
             raise OpenQasmException(
                 f"OpenQASM if conditions must be castable to bool."
                 f" Got {type(condition).__name__} {condition!r} instead.",
@@ -854,11 +910,13 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             )
 
         if condition:
-            if if_block:
+            if statement.if_block:
+                if_block = ast.Box(body=statement.if_block, duration=None)
                 with self.namespace.new_scope():
                     return self._transpile(if_block, uid_hint="if_block")
         else:
-            if else_block:
+            if statement.else_block:
+                else_block = ast.Box(body=statement.else_block, duration=None)
                 with self.namespace.new_scope():
                     return self._transpile(else_block, uid_hint="else_block")
 
@@ -881,9 +939,13 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
                     namespace=self.namespace,
                     type_=int,
                 )
+                if step == 0:
+                    msg = "Loop range step must not be zero."
+                    raise OpenQasmException(msg, mark=loop_set_decl.span)
             else:
                 step = 1
-            count = math.floor(((stop - start) / step) + 1)
+            # The bounds are ints, so floor division is exact
+            count = (stop - start) // step + 1
             sweep_param = LinearSweepParameter(
                 uid=id_generator("sweep_parameter"),
                 start=start,
@@ -918,15 +980,8 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             raise OpenQasmException(msg)
         if isinstance(lvalue, list):
             raise OpenQasmException("Cannot assign to arrays")
-        ops = {
-            "=": lambda a, b: b,
-            "*=": operator.mul,
-            "/=": operator.truediv,
-            "+=": operator.add,
-            "-=": operator.sub,
-        }
         try:
-            op = ops[statement.op.name]
+            op = _ASSIGNMENT_OPS[statement.op.name]
         except KeyError as e:
             msg = "Unsupported assignment operator"
             raise OpenQasmException(msg, mark=statement.span) from e
@@ -944,32 +999,31 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
 
     def _handle_measurement(self, statement: ast.QuantumMeasurementStatement):
         qubits = eval_expression(statement.measure.qubit, namespace=self.namespace)
-        bits = statement.target
-        if bits is None:
+        if statement.target is None:
             raise OpenQasmException(
                 "Measurement must be assigned to a classical bit",
                 mark=statement.span,
             )
         bits = eval_lvalue(statement.target, namespace=self.namespace)
         if isinstance(qubits, list):
-            err_msg = None
             if not isinstance(bits, Array):
                 err_msg = "Both bits and qubits must be either scalar or registers."
-            bits = bits.value
-            if len(bits) != len(qubits):
+                raise OpenQasmException(err_msg, statement.span)
+            bits_list = bits.value
+            qubits_list = qubits
+            if len(bits_list) != len(qubits_list):
                 err_msg = "Bit and qubit registers must be same length"
-            if err_msg is not None:
                 raise OpenQasmException(err_msg, statement.span)
         else:
-            bits = [bits]
-            qubits = [qubits]
+            bits_list = [bits]
+            qubits_list = [qubits]
 
-        assert all(isinstance(q, QubitRef) for q in qubits)
-        assert all(isinstance(b, ClassicalRef) for b in bits)
+        assert all(isinstance(q, QubitRef) for q in qubits_list)
+        assert all(isinstance(b, ClassicalRef) for b in bits_list)
 
         # Build the section
         s = Section(uid=id_generator("measurement"))
-        for q, b in zip(qubits, bits):
+        for q, b in zip(qubits_list, bits_list):
             handle_name = b.canonical_name
             qubit_name = q.canonical_name
             section = self._call_gate(
@@ -993,14 +1047,6 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
 
     _PRAGMA_ZI_PREFIX = "zi."
 
-    _PRAGMA_ZI_STATEMENTS_RE = re.compile(
-        r"""
-        # ORed list of supported statements:
-        (zi\.acquisition_type[ \t]+(?P<acquisition_type>[^ \t]*))
-    """,
-        re.VERBOSE,
-    )
-
     def _handle_pragma(self, statement: ast.Pragma):
         pragma = statement.command
 
@@ -1008,16 +1054,16 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
             # we only process pragmas marked for Zurich Instruments
             return
 
-        match = self._PRAGMA_ZI_STATEMENTS_RE.fullmatch(pragma)
-        if match is None:
+        # A zi. pragma is a statement keyword followed by a single argument,
+        # separated by spaces or tabs.
+        body = pragma[len(self._PRAGMA_ZI_PREFIX) :].replace("\t", " ")
+        keyword, _, argument = body.partition(" ")
+        argument = argument.lstrip(" ")
+        handler = self._pragma_zi_statements.get(keyword)
+        if handler is None or not argument or " " in argument:
             msg = f"Invalid Zurich Instruments (zi.) pragma body: {pragma!r}"
             raise OpenQasmException(msg)
-        if acquisition_type := match.group("acquisition_type"):
-            return self._pragma_acquisition_type(acquisition_type)
-        # The RuntimeError below should be unreachable -- it is a sanity
-        # check to guard against cases from _PRAGMA_ZI_STATEMENTS_RE not being
-        # handled in the lines above:
-        raise RuntimeError(f"Unknown zhinst.com pragma statement: {pragma!r}")
+        return handler(self, argument)
 
     def _pragma_acquisition_type(self, acquisition_type: str):
         """Set the acquisition type specified via a pragma."""
@@ -1031,3 +1077,8 @@ class TranspilerVisitor(openqasm3.visitor.QASMVisitor):
                 msg = f"Attempt to change acquisition_type from {existing_type!r} to {acquisition_type!r}"
                 raise OpenQasmException(msg)
         self.acquire_loop_options["acquisition_type"] = acquisition_type
+
+    # Supported zi. pragma statements: keyword -> handler(self, argument)
+    _pragma_zi_statements = {
+        "acquisition_type": _pragma_acquisition_type,
+    }